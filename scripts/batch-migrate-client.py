@@ -2,77 +2,215 @@
 """
 Batch migrate client-side console.log statements to logger
 """
+import argparse
+import functools
 import os
 import re
-import sys
-
-def migrate_file(filepath: str) -> bool:
-    """Migrate a single client file to use logger instead of console.
+import shutil
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+# Mapping of console methods to logger methods
+CONSOLE_TO_LOGGER_MAP: dict[str, str] = {
+    'console.log': 'logger.info',
+    'console.error': 'logger.error',
+    'console.warn': 'logger.warn',
+    'console.info': 'logger.info',
+    'console.debug': 'logger.debug',
+}
+
+# Path patterns to logger import paths (checked in order, first match wins)
+IMPORT_PATH_RULES: list[tuple[str, str]] = [
+    ('/components/', "import logger from '../lib/logger';"),
+    ('/services/', "import logger from '../lib/logger';"),
+    ('/lib/', "import logger from './logger';"),
+]
+
+# Root level ts/tsx files (and anything else)
+DEFAULT_LOGGER_IMPORT = "import logger from './lib/logger';"
+
+# Single alternation over every console method, compiled once at import,
+# so each file is scanned in one pass rather than once per method. The
+# pattern deliberately starts with the literal 'console.' so the regex
+# engine can jump between literal occurrences; the leading word boundary
+# is checked per match by the rewriter instead.
+_CONSOLE_PATTERN = re.compile(
+    '(?:' + '|'.join(map(re.escape, CONSOLE_TO_LOGGER_MAP)) + r')\b'
+)
+
+def _build_console_rewriter(
+    pattern: re.Pattern[str], console_to_logger: dict[str, str]
+) -> Callable[[str], str]:
+    """Build a console.* -> logger.* rewriter specialised to one method table.
+
+    The pattern's sub method and the table are bound as closure variables
+    once, and the leading word-boundary test uses str methods (a regex word
+    character is exactly isalnum() or '_') instead of a second regex call.
+    """
+    sub = pattern.sub
+
+    def replace_match(match: re.Match[str]) -> str:
+        console_call = match[0]
+        start = match.start()
+        if start:
+            # Skip e.g. 'myconsole.log'
+            previous = match.string[start - 1]
+            if previous.isalnum() or previous == '_':
+                return console_call
+        return console_to_logger[console_call]
+
+    def apply_console_replacements(content: str) -> str:
+        """Replace all console.* calls with logger.* equivalents."""
+        return sub(replace_match, content)
+
+    return apply_console_replacements
+
+_apply_console_replacements = _build_console_rewriter(_CONSOLE_PATTERN, CONSOLE_TO_LOGGER_MAP)
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_import_for_dir(dirname: str) -> str:
+    """Determine the logger import for files in a directory (cached per directory)."""
+    # Every rule pattern ends in '/', so it can only match the directory part
+    dir_path = dirname + '/'
+    for path_pattern, import_statement in IMPORT_PATH_RULES:
+        if path_pattern in dir_path:
+            return import_statement
+    return DEFAULT_LOGGER_IMPORT
+
+def _find_last_import_end(content: str) -> int:
+    """Find an offset on the last import line (excluding type imports), or -1."""
+    # Backwards literal search beats a line-anchored regex tried at every offset
+    pos = len(content)
+    while True:
+        pos = content.rfind('import ', 0, pos)
+        if pos == -1:
+            return -1
+        line_start = content.rfind('\n', 0, pos) + 1
+        line_end = content.find('\n', pos)
+        if line_end == -1:
+            line_end = len(content)
+        # Same test as line.strip().startswith('import '): whitespace only
+        # before it and something other than whitespace after it
+        if (not content[line_start:pos].strip()
+                and content[pos + len('import '):line_end].strip()
+                and not content.startswith('import type', pos)):
+            return pos + len('import ')
+
+def _transform_file(filepath: str) -> bytes | None:
+    """Compute the migrated contents of a single client file without writing it.
 
     Args:
         filepath: Path to the TypeScript/JavaScript file to migrate.
 
     Returns:
-        True if the file was modified, False if no changes were needed.
+        The new file contents, or None if no changes were needed or the
+        file does not exist.
     """
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+    # Binary I/O keeps the file's bytes (including line endings) untouched
+    # apart from the rewritten calls and the added import
+    try:
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        print(f"⚠️  File not found: {filepath}")
+        return None
+
+    # Cheap literal scan on the raw bytes lets files without any console
+    # usage skip both the UTF-8 decode and the regex
+    if b'console.' not in raw:
+        print(f"⏭️  No changes: {filepath}")
+        return None
 
-    original_content = content
+    content = raw.decode('utf-8')
 
-    # Check if logger is already imported
-    has_logger_import = 'import logger from' in content or "import logger from" in content
+    original_content = content
 
     # Replace console statements
-    content = re.sub(r'\bconsole\.log\b', 'logger.info', content)
-    content = re.sub(r'\bconsole\.error\b', 'logger.error', content)
-    content = re.sub(r'\bconsole\.warn\b', 'logger.warn', content)
-    content = re.sub(r'\bconsole\.info\b', 'logger.info', content)
-    content = re.sub(r'\bconsole\.debug\b', 'logger.debug', content)
+    content = _apply_console_replacements(content)
 
-    # Only proceed if we made changes
+    # Only proceed if we made changes; untouched files keep their mtime
     if content == original_content:
         print(f"⏭️  No changes: {filepath}")
-        return False
+        return None
+
+    # Check if logger is already imported. The whole file is searched on
+    # purpose: the import need not start its line (';import logger from')
+    has_logger_import = 'import logger from' in content
 
     # Add logger import if not present
     if not has_logger_import:
-        lines = content.split('\n')
-
         # Find last import statement
-        last_import_idx = -1
-        for i, line in enumerate(lines):
-            if line.strip().startswith('import ') and not line.strip().startswith('import type'):
-                last_import_idx = i
+        last_import_end = _find_last_import_end(content)
 
         # Determine relative path to logger based on file location
-        if '/components/' in filepath:
-            logger_import = "import logger from '../lib/logger';"
-        elif '/services/' in filepath:
-            logger_import = "import logger from '../lib/logger';"
-        elif '/lib/' in filepath:
-            logger_import = "import logger from './logger';"
-        elif filepath.endswith('.tsx') or filepath.endswith('.ts'):
-            # For root level ts/tsx files
-            logger_import = "import logger from './lib/logger';"
-        else:
-            logger_import = "import logger from './lib/logger';"
+        logger_import = _resolve_import_for_dir(os.path.dirname(filepath))
 
-        # Insert import after last import or at beginning
-        if last_import_idx >= 0:
-            lines.insert(last_import_idx + 1, logger_import)
+        # Insert import on its own line after last import or at beginning,
+        # using the file's own line ending
+        newline = '\r\n' if '\r\n' in content else '\n'
+        if last_import_end < 0:
+            content = logger_import + newline + content
         else:
-            lines.insert(0, logger_import)
+            line_end = content.find('\n', last_import_end)
+            if line_end == -1:
+                content = content + newline + logger_import
+            else:
+                content = content[:line_end + 1] + logger_import + newline + content[line_end + 1:]
 
-        content = '\n'.join(lines)
+    return content.encode('utf-8')
 
-    # Write back
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
+def _write_file_atomic(filepath: str, data: bytes) -> None:
+    """Replace a file via a temp file in the same directory, keeping its mode.
+
+    Symlinks are resolved first so the link target is rewritten and the link
+    itself survives. The replacement is a new inode, so hard links to the old
+    file are broken and owner/group are those of the current user.
+    """
+    target = os.path.realpath(filepath)
+    tmp = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(target), prefix='.batch-migrate-', delete=False
+    )
+    try:
+        with tmp:
+            tmp.write(data)
+        shutil.copymode(target, tmp.name)
+        os.replace(tmp.name, target)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+def _write_migrated(filepath: str, data: bytes | None) -> bool:
+    """Write a transformed file and report it; False if there was nothing to write."""
+    if data is None:
+        return False
 
+    _write_file_atomic(filepath, data)
     print(f"✅ Migrated: {filepath}")
     return True
 
+def _positive_int(value: str) -> int:
+    """argparse type accepting integers of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be a positive integer, got {value!r}')
+    return number
+
+def migrate_file(filepath: str) -> bool:
+    """Migrate a single client file to use logger instead of console.
+
+    Args:
+        filepath: Path to the TypeScript/JavaScript file to migrate.
+
+    Returns:
+        True if the file was modified, False if no changes were needed
+        or the file does not exist.
+    """
+    return _write_migrated(filepath, _transform_file(filepath))
+
 def main() -> None:
     """Entry point for batch migration of client-side console statements.
 
@@ -80,22 +218,24 @@ def main() -> None:
     console.log/error/warn/info/debug calls to use the logger utility.
 
     Usage:
-        python3 batch-migrate-client.py <file1> <file2> ...
+        python3 batch-migrate-client.py [--jobs N] <file1> <file2> ...
     """
-    if len(sys.argv) < 2:
-        print("Usage: python3 batch-migrate-client.py <file1> <file2> ...")
-        sys.exit(1)
-
-    files = sys.argv[1:]
-    migrated_count = 0
-
-    for filepath in files:
-        if not os.path.exists(filepath):
-            print(f"⚠️  File not found: {filepath}")
-            continue
-
-        if migrate_file(filepath):
-            migrated_count += 1
+    parser = argparse.ArgumentParser(
+        description='Migrate client-side console.* calls to the logger.'
+    )
+    parser.add_argument('files', nargs='+', metavar='file',
+                        help='TypeScript/JavaScript file to migrate')
+    parser.add_argument('-j', '--jobs', type=_positive_int, default=None,
+                        help='worker processes for the transform (default: one per CPU)')
+    args = parser.parse_args()
+
+    # Transform in parallel, but write from this process only so each file
+    # is swapped in atomically and writes never contend with each other
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        results = executor.map(_transform_file, args.files, chunksize=16)
+        migrated_count = sum(
+            _write_migrated(filepath, data) for filepath, data in zip(args.files, results)
+        )
 
     print(f"\n✨ Migrated {migrated_count} files")
 
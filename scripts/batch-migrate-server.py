@@ -2,9 +2,14 @@
 """
 Batch migrate console.log statements to Pino logger
 """
+import argparse
+import functools
 import os
 import re
-import sys
+import shutil
+import tempfile
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
 
 # ---------------------------------------------------------------------------
 # Data-Driven Configuration
@@ -32,85 +37,230 @@ IMPORT_PATH_RULES: list[tuple[str, str]] = [
 
 DEFAULT_LOGGER_IMPORT = "import logger from '../lib/logger';"
 
+# Single alternation over every console method, compiled once at import,
+# so each file is scanned in one pass rather than once per method. The
+# pattern deliberately starts with the literal 'console.' so the regex
+# engine can jump between literal occurrences; the leading word boundary
+# is checked per match by the rewriter instead.
+_CONSOLE_PATTERN = re.compile(
+    '(?:' + '|'.join(map(re.escape, CONSOLE_TO_LOGGER_MAP)) + r')\b'
+)
+
 
 # ---------------------------------------------------------------------------
 # Helper Functions
 # ---------------------------------------------------------------------------
 
-def _apply_console_replacements(content: str) -> str:
-    """Replace all console.* calls with logger.* equivalents."""
-    for console_method, logger_method in CONSOLE_TO_LOGGER_MAP.items():
-        pattern = rf'\b{re.escape(console_method)}\b'
-        content = re.sub(pattern, logger_method, content)
-    return content
+def _build_console_rewriter(
+    pattern: re.Pattern[str], console_to_logger: dict[str, str]
+) -> Callable[[str], str]:
+    """Build a console.* -> logger.* rewriter specialised to one method table.
+
+    The pattern's sub method and the table are bound as closure variables
+    once, and the leading word-boundary test uses str methods (a regex word
+    character is exactly isalnum() or '_') instead of a second regex call.
+    """
+    sub = pattern.sub
+
+    def replace_match(match: re.Match[str]) -> str:
+        console_call = match[0]
+        start = match.start()
+        if start:
+            # Skip e.g. 'myconsole.log'
+            previous = match.string[start - 1]
+            if previous.isalnum() or previous == '_':
+                return console_call
+        return console_to_logger[console_call]
+
+    def apply_console_replacements(content: str) -> str:
+        """Replace all console.* calls with logger.* equivalents."""
+        return sub(replace_match, content)
+
+    return apply_console_replacements
+
+
+_apply_console_replacements = _build_console_rewriter(_CONSOLE_PATTERN, CONSOLE_TO_LOGGER_MAP)
 
 
 def _get_logger_import_for_path(filepath: str) -> str:
     """Determine the appropriate logger import based on file path."""
+    return _resolve_import_for_dir(os.path.dirname(filepath))
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_import_for_dir(dirname: str) -> str:
+    """Determine the logger import for files in a directory (cached per directory)."""
+    # Every rule pattern ends in '/', so it can only match the directory part
+    dir_path = dirname + '/'
     for path_pattern, import_statement in IMPORT_PATH_RULES:
-        if path_pattern in filepath:
+        if path_pattern in dir_path:
             return import_statement
     return DEFAULT_LOGGER_IMPORT
 
 
-def _find_last_import_index(lines: list[str]) -> int:
-    """Find the index of the last import statement (excluding type imports)."""
-    last_import_idx = -1
-    for i, line in enumerate(lines):
-        if line.strip().startswith('import ') and not line.strip().startswith('import type'):
-            last_import_idx = i
-    return last_import_idx
+def _find_last_import_end(content: str) -> int:
+    """Find an offset on the last import line (excluding type imports), or -1.
+
+    Searches backwards with str.rfind for the literal 'import ', which is far
+    cheaper than a line-anchored regex that has to be tried at every offset.
+    """
+    pos = len(content)
+    while True:
+        pos = content.rfind('import ', 0, pos)
+        if pos == -1:
+            return -1
+        line_start = content.rfind('\n', 0, pos) + 1
+        line_end = content.find('\n', pos)
+        if line_end == -1:
+            line_end = len(content)
+        # Same test as line.strip().startswith('import '): whitespace only
+        # before it and something other than whitespace after it
+        if (not content[line_start:pos].strip()
+                and content[pos + len('import '):line_end].strip()
+                and not content.startswith('import type', pos)):
+            return pos + len('import ')
+
+
+def _has_logger_import(content: str) -> bool:
+    """Check for an existing logger import anywhere in the file.
+
+    The whole file is searched on purpose: a logger import need not start
+    its line (e.g. ';import logger from' or after a block comment), so no
+    bound short of the last occurrence would catch every one.
+    """
+    return 'import logger from' in content
+
+
+def _detect_newline(content: str) -> str:
+    """Return the file's line ending so inserted lines match the rest."""
+    return '\r\n' if '\r\n' in content else '\n'
+
+
+def _insert_line_after(content: str, line: str, pos: int, newline: str) -> str:
+    """Insert line on its own, directly after the line containing offset pos."""
+    line_end = content.find('\n', pos)
+    if line_end == -1:
+        return content + newline + line
+    return content[:line_end + 1] + line + newline + content[line_end + 1:]
 
 
-def _insert_import(lines: list[str], logger_import: str, last_import_idx: int) -> list[str]:
+def _insert_import(content: str, logger_import: str, last_import_end: int) -> str:
     """Insert logger import at the appropriate position."""
-    if last_import_idx >= 0:
-        lines.insert(last_import_idx + 1, logger_import)
-    elif lines[0].startswith('#!'):
+    newline = _detect_newline(content)
+    if last_import_end >= 0:
+        return _insert_line_after(content, logger_import, last_import_end, newline)
+    if content.startswith('#!'):
         # Insert after shebang (and blank line if present)
-        insert_pos = 2 if len(lines) > 1 and lines[1].strip() == '' else 1
-        lines.insert(insert_pos, logger_import)
-    else:
-        lines.insert(0, logger_import)
-    return lines
+        first_newline = content.find('\n')
+        if first_newline == -1:
+            return _insert_line_after(content, logger_import, 0, newline)
+        second_newline = content.find('\n', first_newline + 1)
+        second_line = content[first_newline + 1:second_newline if second_newline != -1 else None]
+        pos = first_newline + 1 if second_line.strip() == '' else 0
+        return _insert_line_after(content, logger_import, pos, newline)
+    return logger_import + newline + content
 
 
-def migrate_file(filepath: str) -> bool:
-    """Migrate a single file to use Pino logger instead of console.
+def _transform_file(filepath: str) -> bytes | None:
+    """Compute the migrated contents of a single file without writing it.
 
     Args:
         filepath: Path to the TypeScript/JavaScript file to migrate.
 
     Returns:
-        True if the file was modified, False if no changes were needed.
+        The new file contents, or None if no changes were needed or the
+        file does not exist.
     """
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
+    # Binary I/O keeps the file's bytes (including line endings) untouched
+    # apart from the rewritten calls and the added import
+    try:
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+    except FileNotFoundError:
+        print(f"⚠️  File not found: {filepath}")
+        return None
+
+    # Cheap literal scan on the raw bytes lets files without any console
+    # usage skip both the UTF-8 decode and the regex
+    if b'console.' not in raw:
+        print(f"⏭️  No changes: {filepath}")
+        return None
+
+    content = raw.decode('utf-8')
 
     original_content = content
-    has_logger_import = 'import logger from' in content
 
     # Apply all console -> logger replacements
     content = _apply_console_replacements(content)
 
+    # Leave untouched files alone so their mtime stays valid for build caches
     if content == original_content:
         print(f"⏭️  No changes: {filepath}")
-        return False
+        return None
 
     # Add logger import if not present
-    if not has_logger_import:
-        lines = content.split('\n')
+    if not _has_logger_import(content):
         logger_import = _get_logger_import_for_path(filepath)
-        last_import_idx = _find_last_import_index(lines)
-        lines = _insert_import(lines, logger_import, last_import_idx)
-        content = '\n'.join(lines)
+        last_import_end = _find_last_import_end(content)
+        content = _insert_import(content, logger_import, last_import_end)
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
+    return content.encode('utf-8')
 
+
+def _write_file_atomic(filepath: str, data: bytes) -> None:
+    """Replace a file via a temp file in the same directory, keeping its mode.
+
+    Symlinks are resolved first so the link target is rewritten and the link
+    itself survives. The replacement is a new inode, so hard links to the old
+    file are broken and owner/group are those of the current user.
+    """
+    target = os.path.realpath(filepath)
+    tmp = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(target), prefix='.batch-migrate-', delete=False
+    )
+    try:
+        with tmp:
+            tmp.write(data)
+        shutil.copymode(target, tmp.name)
+        os.replace(tmp.name, target)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+
+
+def _write_migrated(filepath: str, data: bytes | None) -> bool:
+    """Write a transformed file and report it; False if there was nothing to write."""
+    if data is None:
+        return False
+
+    _write_file_atomic(filepath, data)
     print(f"✅ Migrated: {filepath}")
     return True
 
+
+def _positive_int(value: str) -> int:
+    """argparse type accepting integers of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f'must be a positive integer, got {value!r}')
+    return number
+
+
+def migrate_file(filepath: str) -> bool:
+    """Migrate a single file to use Pino logger instead of console.
+
+    Args:
+        filepath: Path to the TypeScript/JavaScript file to migrate.
+
+    Returns:
+        True if the file was modified, False if no changes were needed
+        or the file does not exist.
+    """
+    return _write_migrated(filepath, _transform_file(filepath))
+
 def main() -> None:
     """Entry point for batch migration of console statements to Pino logger.
 
@@ -118,26 +268,33 @@ def main() -> None:
     console.log/error/warn/info/debug calls to use the Pino logger utility.
 
     Usage:
-        python3 batch-migrate.py <file1> <file2> ...
+        python3 batch-migrate.py [--jobs N] <file1> <file2> ...
     """
-    if len(sys.argv) < 2:
-        print("Usage: python3 batch-migrate.py <file1> <file2> ...")
-        sys.exit(1)
-
-    files = sys.argv[1:]
-    migrated_count = 0
-
-    for filepath in files:
-        if not os.path.exists(filepath):
-            print(f"⚠️  File not found: {filepath}")
-            continue
-
+    parser = argparse.ArgumentParser(
+        description='Migrate console.* calls to the Pino logger.'
+    )
+    parser.add_argument('files', nargs='+', metavar='file',
+                        help='TypeScript/JavaScript file to migrate')
+    parser.add_argument('-j', '--jobs', type=_positive_int, default=None,
+                        help='worker processes for the transform (default: one per CPU)')
+    args = parser.parse_args()
+
+    files_to_migrate = []
+
+    for filepath in args.files:
         if 'migrate-to-logger.ts' in filepath:
             print(f"⏭️  Skipping migration script: {filepath}")
             continue
 
-        if migrate_file(filepath):
-            migrated_count += 1
+        files_to_migrate.append(filepath)
+
+    # Workers transform files in parallel; this process is the only writer,
+    # so renames happen one at a time and each file is replaced atomically
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        results = executor.map(_transform_file, files_to_migrate, chunksize=16)
+        migrated_count = sum(
+            _write_migrated(filepath, data) for filepath, data in zip(files_to_migrate, results)
+        )
 
     print(f"\n✨ Migrated {migrated_count} files")
 
@@ -1,39 +1,139 @@
 #!/usr/bin/env python3
+import collections
 import json
-import requests
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson parses the history response several times faster when available;
+# both accept the raw response bytes
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Matches the server's scrape limiter defaults
+# (SCRAPER_RATE_LIMIT_MAX requests per SCRAPER_RATE_LIMIT_WINDOW)
+MAX_RATE = 5
+TIME_PERIOD = 60
+MAX_WORKERS = 8
+
+HISTORY_URL = 'http://localhost:3002/api/properties/history?limit=100'
+SCRAPE_URL = 'http://localhost:3002/api/properties/scrape'
+
+# 5xx responses to a scrape POST are retried by queue_term itself, so each
+# attempt still goes through the rate limiter
+SCRAPE_ATTEMPTS = 3
+SERVER_ERRORS = {500, 502, 503, 504}
+
+
+class RateLimiter:
+    """Allow at most max_rate acquisitions in any time_period seconds."""
+
+    def __init__(self, max_rate: int, time_period: float) -> None:
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._sent: collections.deque[float] = collections.deque()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until another request fits in the current window."""
+        with self._lock:
+            if len(self._sent) >= self.max_rate:
+                wait = self._sent.popleft() + self.time_period - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+            self._sent.append(time.monotonic())
+
+
+limiter = RateLimiter(MAX_RATE, TIME_PERIOD)
+
+# One pooled session for every request, with retries and exponential
+# backoff handled by urllib3 (429s honor Retry-After)
+session = requests.Session()
+adapter = HTTPAdapter(
+    pool_connections=MAX_WORKERS,
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=1.0,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    ),
+)
+session.mount('http://', adapter)
+session.mount('https://', adapter)
+
+# Scrape POSTs only retry 429s here: the server's rate limiter rejects those
+# before the handler runs, and the retry waits out its Retry-After rather
+# than the local limiter. Other statuses are left to queue_term. The POST is
+# not idempotent, so a read timeout or dropped response (the job may already
+# be queued) is never re-sent; only connect errors are, as nothing was sent
+scrape_adapter = HTTPAdapter(
+    pool_connections=MAX_WORKERS,
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(
+        total=5,
+        read=0,
+        other=0,
+        backoff_factor=1.0,
+        status_forcelist=[429],
+        allowed_methods={'POST'},
+        raise_on_status=False,
+    ),
+)
+session.mount(SCRAPE_URL, scrape_adapter)
 
 # Get failed jobs
-response = requests.get('http://localhost:3002/api/properties/history?limit=100')
-data = response.json()
-failed_jobs = [job for job in data['data'] if job['status'] == 'failed']
-
-# Get unique search terms
-search_terms = list(set([job['searchTerm'] for job in failed_jobs]))
-
-print(f'Re-queueing {len(search_terms)} unique failed search terms with 6-second delays...\n')
-
-success = 0
-failed = 0
-for i, term in enumerate(search_terms, 1):
-    try:
-        response = requests.post(
-            'http://localhost:3002/api/properties/scrape',
-            json={'searchTerm': term},
-            headers={'Content-Type': 'application/json'},
-            timeout=10
-        )
+response = session.get(HISTORY_URL)
+data = json_loads(response.content)
+
+# Get unique failed search terms in one pass, keeping first-seen order so
+# runs are repeatable
+search_terms = list(dict.fromkeys(
+    job['searchTerm'] for job in data['data'] if job['status'] == 'failed'
+))
+
+print(f'Re-queueing {len(search_terms)} unique failed search terms '
+      f'at up to {MAX_RATE} requests per {TIME_PERIOD}s...\n')
+
+
+def queue_term(i: int, term: str) -> bool:
+    """Re-queue one search term, waiting for the rate limiter before each attempt."""
+    for attempt in range(1, SCRAPE_ATTEMPTS + 1):
+        limiter.acquire()
+        try:
+            response = session.post(
+                SCRAPE_URL,
+                json={'searchTerm': term},
+                headers={'Content-Type': 'application/json'},
+                timeout=10
+            )
+        except Exception as e:
+            print(f'{i}/{len(search_terms)} ✗ Error: "{term}" - {str(e)}')
+            return False
+
         if response.status_code == 202:
             print(f'{i}/{len(search_terms)} ✓ Queued: "{term}"')
-            success += 1
-        else:
-            print(f'{i}/{len(search_terms)} ✗ Failed: "{term}" - HTTP {response.status_code}')
-            failed += 1
-        time.sleep(6)  # Wait 6 seconds between requests to avoid rate limiting
-    except Exception as e:
-        print(f'{i}/{len(search_terms)} ✗ Error: "{term}" - {str(e)}')
-        failed += 1
-        time.sleep(6)
+            return True
+        if response.status_code not in SERVER_ERRORS or attempt == SCRAPE_ATTEMPTS:
+            break
+        print(f'{i}/{len(search_terms)} ↻ Retrying: "{term}" - HTTP {response.status_code}')
+        time.sleep(2 ** (attempt - 1))
+
+    print(f'{i}/{len(search_terms)} ✗ Failed: "{term}" - HTTP {response.status_code}')
+    return False
+
+
+with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+    results = list(executor.map(queue_term, range(1, len(search_terms) + 1), search_terms))
+
+success = sum(results)
+failed = len(results) - success
 
 print(f'\n✅ Successfully queued: {success}')
 print(f'❌ Failed to queue: {failed}')